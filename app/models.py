@@ -203,11 +203,11 @@ class Lead(db.Model):
     industry = db.Column(db.String(64), nullable=False)
     source = db.Column(db.String(64), nullable=True)
     notes = db.Column(db.Text, nullable=True)
-    status = db.Column(db.String(32), nullable=False, default='New')
+    status = db.Column(db.String(32), nullable=False, default='New', index=True)
     followup_date = db.Column(db.Date, nullable=True)  # Only updated from dashboard
     timezone = db.Column(db.String(16), nullable=True)
     revenue = db.Column(db.Float, nullable=True, default=0.0)  # Revenue amount in dollars
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     updated_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
@@ -5,9 +5,18 @@ from sqlalchemy import inspect
 
 app = create_app()
  
+def ensure_lead_indexes():
+    # create_all() only builds indexes for new tables; add any missing ones to existing databases
+    inspector = inspect(db.engine)
+    existing = {index['name'] for index in inspector.get_indexes('leads')}
+    for index in Lead.__table__.indexes:
+        if index.name not in existing:
+            index.create(db.engine)
+
 with app.app_context():
     # Create all tables
     db.create_all()
+    ensure_lead_indexes()
     print("Database tables created successfully!")
     # Remove any demo/mockup data insertion for PixelPro Studios and Acme Global 
 
@@ -46,9 +46,9 @@ CREATE TABLE IF NOT EXISTS tasks (
     updated_at TIMESTAMP DEFAULT NOW()
 );
 
--- Insert default admin user
+-- Insert default admin user (password: admin123, stored as a werkzeug scrypt hash)
 INSERT INTO users (username, password, role, email) 
-VALUES ('admin', 'admin123', 'admin', 'admin@eacrm.com')
+VALUES ('admin', 'scrypt:32768:8:1$oRK3cLBY8kSAIf7Y$78b01d0f50f5933856d8c12d2bfb86971eb244e1681b4f09338ada409f95ad6898ec659844cdd3bcd81b1b328213566cd9f48f8ee8a5cfd22f8ce2ff2052e389', 'admin', 'admin@eacrm.com')
 ON CONFLICT (username) DO NOTHING;
 
 -- Insert sample leads
@@ -68,9 +68,11 @@ ON CONFLICT DO NOTHING;
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_leads_status ON leads(status);
 CREATE INDEX IF NOT EXISTS idx_leads_assigned_to ON leads(assigned_to);
+CREATE INDEX IF NOT EXISTS idx_leads_created_at ON leads(created_at DESC, id DESC);
 CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
 CREATE INDEX IF NOT EXISTS idx_tasks_assigned_to ON tasks(assigned_to);
 CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date);
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks(created_at DESC, id DESC);
 
 -- Create updated_at trigger function
 CREATE OR REPLACE FUNCTION update_updated_at_column()
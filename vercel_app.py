@@ -4,13 +4,234 @@ EA CRM with Supabase database for Vercel deployment
 Production-ready version with external database
 """
 
-from flask import Flask, request, redirect
+from flask import Flask, Response, request
+from markupsafe import escape
+from werkzeug.security import check_password_hash
 import os
+import gzip
+import hashlib
+import hmac
+import sqlite3
+import time
+import threading
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from string import Template
 from supabase import create_client, Client
+from postgrest.exceptions import APIError
+import httpx
 
 app = Flask(__name__)
 
+def compact_html(html):
+    """Drop the source indentation and blank lines from an HTML constant
+
+    Runs at import. Line breaks are kept, so whitespace between inline
+    elements still renders the same.
+    """
+    lines = (line.strip() for line in html.splitlines())
+    return '\n'.join(line for line in lines if line) + '\n'
+
+# Page templates are built once at import; routes only substitute the dynamic bits.
+LOGIN_TPL = Template("""
+<html>
+<head><title>EA CRM - Login</title></head>
+<body>
+    <h1>EA CRM Login</h1>
+    $message
+    <form method="POST">
+        <p>Username: <input type="text" name="username" required></p>
+        <p>Password: <input type="password" name="password" required></p>
+        <p><input type="submit" value="Login"></p>
+    </form>
+    <p><strong>Default:</strong> admin / admin123</p>
+</body>
+</html>
+""")
+
+LOGIN_HTML = compact_html(LOGIN_TPL.substitute(message=''))
+LOGIN_ERROR_HTML = compact_html(LOGIN_TPL.substitute(
+    message='<p style="color: red;">Invalid username or password</p>'))
+
+DASHBOARD_TPL = Template(compact_html("""
+<html>
+<head><title>EA CRM - Dashboard</title></head>
+<body>
+    <h1>EA CRM Dashboard</h1>
+    <p>✅ Success! The CRM is working with $db_label database!</p>
+    <p><a href="/leads">Leads</a> | <a href="/tasks">Tasks</a> | <a href="/add_lead">Add Lead</a> | <a href="/add_task">Add Task</a> | <a href="/">Logout</a></p>
+    
+    <h3>Stats:</h3>
+    <ul>
+        <li>Total Leads: $total_leads</li>
+        <li>New Leads: $new_leads</li>
+        <li>Pending Tasks: $pending_tasks</li>
+        <li>Completed Tasks: $completed_tasks</li>
+    </ul>
+    
+    <h3>Database Status:</h3>
+    <p>Currently using: $db_status</p>
+    <ul>
+        <li>✅ View and manage leads</li>
+        <li>✅ Create and track tasks</li>
+        <li>✅ $storage_note</li>
+        <li>🔄 Next: Add more features</li>
+    </ul>
+</body>
+</html>
+"""))
+
+# Listing pages are streamed: static header, one chunk per row, then the footer
+PAGE_SIZE = 100
+# Deeper pages are clamped so the OFFSET always fits in a database integer
+MAX_PAGE = 100000
+
+LEADS_HEADER = compact_html("""
+<html>
+<head><title>EA CRM - Leads</title></head>
+<body>
+    <h1>Leads Management</h1>
+    <p><a href="/dashboard">← Back to Dashboard</a> | <a href="/add_lead">Add New Lead</a></p>
+    
+    <table border="1" style="width: 100%; border-collapse: collapse;">
+        <tr>
+            <th>Name</th>
+            <th>Email</th>
+            <th>Phone</th>
+            <th>Company</th>
+            <th>Status</th>
+            <th>Source</th>
+        </tr>
+""").encode('utf-8')
+
+LEAD_ROW_TPL = Template(compact_html("""
+        <tr>
+            <td>$name</td>
+            <td>$email</td>
+            <td>$phone</td>
+            <td>$company</td>
+            <td>$status</td>
+            <td>$source</td>
+        </tr>
+"""))
+
+LEADS_FOOTER_TPL = Template(compact_html("""
+    </table>
+    
+    <p><strong>Leads on page $page:</strong> $count</p>
+    <p>$pager</p>
+    <p><strong>Database:</strong> $db_label</p>
+</body>
+</html>
+"""))
+
+TASKS_HEADER = compact_html("""
+<html>
+<head><title>EA CRM - Tasks</title></head>
+<body>
+    <h1>Tasks Management</h1>
+    <p><a href="/dashboard">← Back to Dashboard</a> | <a href="/add_task">Add New Task</a></p>
+    
+    <table border="1" style="width: 100%; border-collapse: collapse;">
+        <tr>
+            <th>Title</th>
+            <th>Description</th>
+            <th>Status</th>
+            <th>Priority</th>
+            <th>Due Date</th>
+            <th>Assigned To</th>
+        </tr>
+""").encode('utf-8')
+
+TASK_ROW_TPL = Template(compact_html("""
+        <tr>
+            <td>$title</td>
+            <td>$description</td>
+            <td>$status</td>
+            <td>$priority</td>
+            <td>$due_date</td>
+            <td>$assigned_to</td>
+        </tr>
+"""))
+
+TASKS_FOOTER_TPL = Template(compact_html("""
+    </table>
+    
+    <p><strong>Tasks on page $page:</strong> $count</p>
+    <p>$pager</p>
+    <p><strong>Database:</strong> $db_label</p>
+</body>
+</html>
+"""))
+
+ADD_LEAD_HTML = compact_html("""
+<html>
+<head><title>EA CRM - Add Lead</title></head>
+<body>
+    <h1>Add New Lead</h1>
+    <p><a href="/leads">← Back to Leads</a></p>
+    
+    <form method="POST">
+        <p>Name: <input type="text" name="name" required></p>
+        <p>Email: <input type="email" name="email"></p>
+        <p>Phone: <input type="text" name="phone"></p>
+        <p>Company: <input type="text" name="company"></p>
+        <p>Source: <input type="text" name="source"></p>
+        <p>Notes: <textarea name="notes"></textarea></p>
+        <p><input type="submit" value="Add Lead"></p>
+    </form>
+</body>
+</html>
+""")
+
+ADD_TASK_HTML = compact_html("""
+<html>
+<head><title>EA CRM - Add Task</title></head>
+<body>
+    <h1>Add New Task</h1>
+    <p><a href="/tasks">← Back to Tasks</a></p>
+    
+    <form method="POST">
+        <p>Title: <input type="text" name="title" required></p>
+        <p>Description: <textarea name="description"></textarea></p>
+        <p>Priority: 
+            <select name="priority">
+                <option value="low">Low</option>
+                <option value="medium" selected>Medium</option>
+                <option value="high">High</option>
+            </select>
+        </p>
+        <p>Due Date: <input type="date" name="due_date"></p>
+        <p>Assigned To: <input type="text" name="assigned_to" value="admin"></p>
+        <p><input type="submit" value="Add Task"></p>
+    </form>
+</body>
+</html>
+""")
+
+HEALTH_TEXT = "Health check: OK ✅"
+
+# Fully static pages are encoded once so Flask can send the bytes as-is
+HTML_CONTENT_TYPE = 'text/html; charset=utf-8'
+LOGIN_PAGE = LOGIN_HTML.encode('utf-8')
+LOGIN_ERROR_PAGE = LOGIN_ERROR_HTML.encode('utf-8')
+ADD_LEAD_PAGE = ADD_LEAD_HTML.encode('utf-8')
+ADD_TASK_PAGE = ADD_TASK_HTML.encode('utf-8')
+HEALTH_PAGE = HEALTH_TEXT.encode('utf-8')
+
+# Static pages only change between deploys, so their ETags are fixed at import
+LOGIN_ETAG = hashlib.md5(LOGIN_PAGE).hexdigest()
+ADD_LEAD_ETAG = hashlib.md5(ADD_LEAD_PAGE).hexdigest()
+ADD_TASK_ETAG = hashlib.md5(ADD_TASK_PAGE).hexdigest()
+STATIC_MAX_AGE = 300
+
+# ...and so are their gzipped forms; mtime=0 keeps the bytes deterministic
+LOGIN_PAGE_GZ = gzip.compress(LOGIN_PAGE, 9, mtime=0)
+ADD_LEAD_PAGE_GZ = gzip.compress(ADD_LEAD_PAGE, 9, mtime=0)
+ADD_TASK_PAGE_GZ = gzip.compress(ADD_TASK_PAGE, 9, mtime=0)
+
+
 def get_supabase():
     """Get Supabase client"""
     try:
@@ -27,23 +248,98 @@ def get_supabase():
         print(f"Supabase connection error: {e}")
         return None
 
-def get_db():
-    """Get database connection - Supabase with SQLite fallback"""
-    supabase = get_supabase()
-    
-    if supabase:
-        try:
-            # Test connection
-            result = supabase.table('users').select('*').limit(1).execute()
-            return supabase
-        except Exception as e:
-            print(f"Supabase test failed: {e}")
-            return None
-    
-    # Fallback to in-memory SQLite
-    try:
-        import sqlite3
-        conn = sqlite3.connect(':memory:')
+LEAD_COLUMNS = ('name', 'email', 'phone', 'company', 'status', 'source')
+TASK_COLUMNS = ('title', 'description', 'status', 'priority', 'due_date', 'assigned_to')
+# Pull a Supabase record's displayed columns out as a tuple in one C-level call
+LEAD_FIELDS = itemgetter(*LEAD_COLUMNS)
+TASK_FIELDS = itemgetter(*TASK_COLUMNS)
+
+# Hot-path SQL is kept in one place as parameterized statements; values never
+# go into the SQL text, so sqlite3's statement cache (keyed by that text) can
+# reuse the compiled statements
+STMTS = {
+    'authenticate': 'SELECT password FROM users WHERE username = ?',
+    'status_counts': (
+        "SELECT 'total', NULL, COUNT(*) FROM leads "
+        "UNION ALL "
+        "SELECT 'lead', status, COUNT(*) FROM leads GROUP BY status "
+        "UNION ALL "
+        "SELECT 'task', status, COUNT(*) FROM tasks GROUP BY status"
+    ),
+    'list_leads': f"SELECT {', '.join(LEAD_COLUMNS)} FROM leads ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+    'list_tasks': f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+    'insert_lead': 'INSERT INTO leads (name, email, phone, company, source, notes) VALUES (?, ?, ?, ?, ?, ?)',
+    'insert_task': 'INSERT INTO tasks (title, description, priority, due_date, assigned_to) VALUES (?, ?, ?, ?, ?)',
+}
+
+# Supabase circuit breaker: how long a good probe is trusted, and the
+# exponential backoff applied while it keeps failing
+SUPABASE_RECHECK_SECONDS = 30
+SUPABASE_RETRY_BASE_SECONDS = 5
+SUPABASE_RETRY_MAX_SECONDS = 300
+# PostgREST/Postgres error codes that mean the database itself is unavailable
+# (connection, resource and operator failures) rather than a bad request
+SUPABASE_OUTAGE_CODES = ('PGRST000', 'PGRST001', 'PGRST002', 'PGRST003', '08', '53', '57', '58', 'XX')
+
+# Dashboard counts rarely change second to second; writes invalidate them early
+DASHBOARD_CACHE_TTL = 60
+
+# Listing ETags combine a per-process token with per-table write counters, so
+# a version number seen on one instance can never match another's data
+PROCESS_TOKEN = os.urandom(8).hex()
+
+# Prefixes of the hash formats written by werkzeug's generate_password_hash
+PASSWORD_HASH_PREFIXES = ('pbkdf2:', 'scrypt:')
+
+# werkzeug scrypt hash of the default admin password (admin123), the same one
+# supabase_schema.sql seeds; hashing it at import would slow every cold start
+DEFAULT_ADMIN_PASSWORD_HASH = (
+    'scrypt:32768:8:1$oRK3cLBY8kSAIf7Y$'
+    '78b01d0f50f5933856d8c12d2bfb86971eb244e1681b4f09338ada409f95ad68'
+    '98ec659844cdd3bcd81b1b328213566cd9f48f8ee8a5cfd22f8ce2ff2052e389'
+)
+
+def is_supabase_outage(exc):
+    """Check whether a Supabase error means the service is unreachable
+
+    Bad input (a 4xx from PostgREST) must not open the circuit breaker, or
+    any user could switch the whole instance over to the fallback.
+    """
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, APIError):
+        # Non-JSON error bodies carry the HTTP status as an int
+        if isinstance(exc.code, int):
+            return exc.code >= 500
+        return str(exc.code or '').startswith(SUPABASE_OUTAGE_CODES)
+    return False
+
+def verify_password(stored, password):
+    """Check a password against its stored hash
+
+    Rows seeded before passwords were hashed still hold plaintext; those are
+    compared in constant time so existing deployments keep working.
+    """
+    if not stored:
+        return False
+    if stored.startswith(PASSWORD_HASH_PREFIXES):
+        return check_password_hash(stored, password)
+    return hmac.compare_digest(stored.encode('utf-8'), password.encode('utf-8'))
+
+# One in-memory SQLite database per process, shared by every request
+_DB_CONN = None
+_DB_LOCK = threading.Lock()
+
+def init_db():
+    """Create the shared SQLite connection, schema and sample data once"""
+    global _DB_CONN
+    with _DB_LOCK:
+        if _DB_CONN is not None:
+            return _DB_CONN
+        
+        conn = sqlite3.connect(':memory:', check_same_thread=False)
+        # Rows can be read by column name as well as unpacked positionally
+        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
         # Create tables if they don't exist
@@ -83,11 +379,17 @@ def get_db():
             )
         ''')
         
-        # Add default admin user if not exists
-        cursor.execute('SELECT * FROM users WHERE username = ?', ('admin',))
-        if not cursor.fetchone():
-            cursor.execute('INSERT INTO users (username, password, role) VALUES (?, ?, ?)',
-                         ('admin', 'admin123', 'admin'))
+        # Index the filtered and ordered columns; users.username is already
+        # covered by the automatic index behind its UNIQUE constraint
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_leads_status ON leads(status)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_leads_created ON leads(created_at DESC, id DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks(created_at DESC, id DESC)')
+        
+        # Add default admin user if not exists; the UNIQUE username makes this idempotent
+        cursor.execute('INSERT INTO users (username, password, role) VALUES (?, ?, ?) '
+                       'ON CONFLICT(username) DO NOTHING',
+                       ('admin', DEFAULT_ADMIN_PASSWORD_HASH, 'admin'))
         
         # Add sample data if tables are empty
         cursor.execute('SELECT COUNT(*) FROM leads')
@@ -107,14 +409,312 @@ def get_db():
             ''')
         
         conn.commit()
+        _DB_CONN = conn
         return conn
-    except Exception as e:
-        print(f"Database error: {e}")
+
+init_db()
+
+class SqliteBackend:
+    """In-memory SQLite fallback used when Supabase is not configured"""
+    
+    label = 'SQLite'
+    status_label = 'SQLite (Development)'
+    storage_note = 'Temporary storage (in-memory)'
+    # Every write to the in-memory database goes through this process
+    local_writes = True
+    
+    def __init__(self):
+        self.conn = init_db()
+    
+    def available(self):
+        return True
+    
+    def authenticate(self, username, password):
+        with _DB_LOCK:
+            row = self.conn.execute(STMTS['authenticate'], (username,)).fetchone()
+        return row is not None and verify_password(row['password'], password)
+    
+    def dashboard_stats(self):
+        # The lead total and the per-status lead and task counts come back
+        # from a single query
+        with _DB_LOCK:
+            rows = self.conn.execute(STMTS['status_counts']).fetchall()
+        counts = {'total': {}, 'lead': {}, 'task': {}}
+        for kind, status, count in rows:
+            counts[kind][status] = count
+        lead_counts, task_counts = counts['lead'], counts['task']
+        return (
+            counts['total'].get(None, 0),
+            lead_counts.get('new', 0),
+            task_counts.get('pending', 0),
+            task_counts.get('completed', 0)
+        )
+    
+    def list_leads(self, offset, limit):
+        with _DB_LOCK:
+            return self.conn.execute(STMTS['list_leads'], (limit, offset)).fetchall()
+    
+    def list_tasks(self, offset, limit):
+        with _DB_LOCK:
+            return self.conn.execute(STMTS['list_tasks'], (limit, offset)).fetchall()
+    
+    def add_lead(self, name, email, phone, company, source, notes):
+        with _DB_LOCK, self.conn:
+            self.conn.execute(STMTS['insert_lead'], (name, email, phone, company, source, notes))
+    
+    def add_task(self, title, description, priority, due_date, assigned_to):
+        with _DB_LOCK, self.conn:
+            self.conn.execute(STMTS['insert_task'], (title, description, priority, due_date, assigned_to))
+
+class SupabaseBackend:
+    """Supabase (PostgreSQL) storage used in production"""
+    
+    label = 'Supabase'
+    status_label = 'Supabase (Production)'
+    storage_note = 'Permanent storage with Supabase'
+    # Other instances write to the same database
+    local_writes = False
+    
+    def __init__(self, client):
+        self.client = client
+        # Independent queries run side by side on the shared client's connection pool
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.healthy = True
+        self.failures = 0
+        self.next_check = 0
+    
+    def mark_healthy(self):
+        self.healthy = True
+        self.failures = 0
+        self.next_check = time.monotonic() + SUPABASE_RECHECK_SECONDS
+    
+    def mark_failed(self):
+        self.failures += 1
+        delay = min(SUPABASE_RETRY_BASE_SECONDS * 2 ** (self.failures - 1), SUPABASE_RETRY_MAX_SECONDS)
+        self.healthy = False
+        self.next_check = time.monotonic() + delay
+    
+    def record_error(self, exc):
+        """Open the breaker for outages; report whether exc was one"""
+        if is_supabase_outage(exc):
+            self.mark_failed()
+            return True
+        return False
+    
+    def available(self):
+        # Reuse the last verdict until it expires instead of probing every request
+        if time.monotonic() < self.next_check:
+            return self.healthy
+        try:
+            # Test connection
+            self.client.table('users').select('id').limit(1).execute()
+        except Exception as e:
+            print(f"Supabase test failed: {e}")
+            self.mark_failed()
+            return False
+        self.mark_healthy()
+        return True
+    
+    def authenticate(self, username, password):
+        try:
+            result = self.client.table('users').select('password').eq('username', username).limit(1).execute()
+        except Exception as e:
+            self.record_error(e)
+            raise
+        return bool(result.data) and verify_password(result.data[0]['password'], password)
+    
+    def dashboard_stats(self):
+        # Only the exact-count header is needed, so no rows are transferred
+        queries = [
+            self.client.table('leads').select('id', count='exact').limit(0),
+            self.client.table('leads').select('id', count='exact').eq('status', 'new').limit(0),
+            self.client.table('tasks').select('id', count='exact').eq('status', 'pending').limit(0),
+            self.client.table('tasks').select('id', count='exact').eq('status', 'completed').limit(0),
+        ]
+        try:
+            results = list(self.executor.map(lambda query: query.execute(), queries))
+            return tuple(result.count or 0 for result in results)
+        except Exception as e:
+            print(f"Supabase dashboard error: {e}")
+            if not self.record_error(e):
+                raise
+            return 0, 0, 0, 0
+    
+    def list_leads(self, offset, limit):
+        try:
+            result = self.client.table('leads').select(','.join(LEAD_COLUMNS)).order('created_at', desc=True).order('id', desc=True).range(offset, offset + limit - 1).execute()
+        except Exception as e:
+            print(f"Supabase leads error: {e}")
+            if not self.record_error(e):
+                raise
+            return []
+        return list(map(LEAD_FIELDS, result.data))
+    
+    def list_tasks(self, offset, limit):
+        try:
+            result = self.client.table('tasks').select(','.join(TASK_COLUMNS)).order('created_at', desc=True).order('id', desc=True).range(offset, offset + limit - 1).execute()
+        except Exception as e:
+            print(f"Supabase tasks error: {e}")
+            if not self.record_error(e):
+                raise
+            return []
+        return list(map(TASK_FIELDS, result.data))
+    
+    def add_lead(self, name, email, phone, company, source, notes):
+        try:
+            self.client.table('leads').insert({
+                'name': name,
+                'email': email,
+                'phone': phone,
+                'company': company,
+                'source': source,
+                'notes': notes
+            }).execute()
+        except Exception as e:
+            self.record_error(e)
+            raise
+    
+    def add_task(self, title, description, priority, due_date, assigned_to):
+        try:
+            self.client.table('tasks').insert({
+                'title': title,
+                'description': description,
+                'priority': priority,
+                'due_date': due_date,
+                'assigned_to': assigned_to
+            }).execute()
+        except Exception as e:
+            self.record_error(e)
+            raise
+
+def create_backend():
+    """Pick the storage backend once at startup - Supabase with SQLite fallback"""
+    supabase = get_supabase()
+    if supabase:
+        return SupabaseBackend(supabase)
+    return SqliteBackend()
+
+def bind_templates(backend):
+    """Fill a backend's fixed labels into the page templates once at startup"""
+    labels = {
+        'db_label': backend.label,
+        'db_status': backend.status_label,
+        'storage_note': backend.storage_note
+    }
+    backend.dashboard_tpl = Template(DASHBOARD_TPL.safe_substitute(labels))
+    backend.leads_footer_tpl = Template(LEADS_FOOTER_TPL.safe_substitute(labels))
+    backend.tasks_footer_tpl = Template(TASKS_FOOTER_TPL.safe_substitute(labels))
+    return backend
+
+BACKEND = bind_templates(create_backend())
+FALLBACK_BACKEND = bind_templates(SqliteBackend())
+
+def get_backend():
+    """Get the backend for reads, falling back to SQLite while Supabase is down"""
+    if BACKEND.available():
+        return BACKEND
+    return FALLBACK_BACKEND
+
+def get_primary_backend():
+    """Get the backend for logins and writes, or None while it is down
+
+    The in-memory fallback would accept writes that vanish once Supabase
+    recovers, and would check logins against its seeded admin password.
+    """
+    if BACKEND.available():
+        return BACKEND
+    return None
+
+_stats_cache = {}
+
+def get_dashboard_stats(backend):
+    """Get dashboard counts, reusing them for up to DASHBOARD_CACHE_TTL seconds"""
+    now = time.monotonic()
+    cached = _stats_cache.get(backend.label)
+    if cached and cached[0] > now:
+        return cached[1]
+    
+    stats = backend.dashboard_stats()
+    # Don't keep the zeroed stats a failed query falls back to
+    if backend.available():
+        _stats_cache[backend.label] = (now + DASHBOARD_CACHE_TTL, stats)
+    return stats
+
+def invalidate_dashboard_stats():
+    """Drop cached dashboard counts after leads or tasks change"""
+    _stats_cache.clear()
+
+_table_versions = {'leads': 0, 'tasks': 0}
+
+def mark_modified(table):
+    """Record a write to table, retiring the ETags of its listing pages"""
+    _table_versions[table] += 1
+    invalidate_dashboard_stats()
+
+def listing_etag(backend, table, page):
+    """Get the ETag for a listing page, or None if it can't be tracked here"""
+    if not backend.local_writes:
         return None
+    version = f"{PROCESS_TOKEN}-{backend.label}-{table}-{_table_versions[table]}-{page}"
+    return hashlib.md5(version.encode('utf-8')).hexdigest()
+
+def revalidate(response, etag):
+    """Tag a data page so browsers revalidate it instead of reusing it blindly"""
+    if etag is not None:
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+    return response
+
+def not_modified(etag):
+    """Get a 304 response if the client already holds the page tagged etag"""
+    if etag is not None and request.if_none_match.contains_weak(etag):
+        return revalidate(Response(status=304), etag)
+    return None
+
+def static_page(body, gzipped, etag):
+    """Serve a prebuilt page, answering 304 when the client's copy is current"""
+    compress = request.accept_encodings['gzip'] > 0
+    if compress:
+        # Each encoding is a separate representation with its own ETag
+        body, etag = gzipped, etag + '-gzip'
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, content_type=HTML_CONTENT_TYPE)
+        if compress:
+            response.content_encoding = 'gzip'
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.max_age = STATIC_MAX_AGE
+    return response
+
+def redirect_to(path):
+    """Build a bare 302 to a fixed path
+
+    A fresh response per request: Flask's session handling may add headers
+    and cookies to whatever a view returns, so responses are never shared.
+    """
+    return Response(status=302, headers={'Location': path})
+
+def get_page():
+    """Get the requested 1-based page number and its row offset"""
+    page = min(max(request.args.get('page', 1, type=int), 1), MAX_PAGE)
+    return page, (page - 1) * PAGE_SIZE
+
+def render_pager(path, page, count):
+    """Render previous/next links for a paginated listing"""
+    links = []
+    if page > 1:
+        links.append(f'<a href="{path}?page={page - 1}">← Previous</a>')
+    if count == PAGE_SIZE:
+        links.append(f'<a href="{path}?page={page + 1}">Next →</a>')
+    return ' | '.join(links)
 
 @app.route('/')
 def home():
-    return redirect('/login')
+    return redirect_to('/login')
 
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -122,212 +722,73 @@ def login():
         username = request.form.get('username', '')
         password = request.form.get('password', '')
         
-        db = get_db()
-        if db:
-            if isinstance(db, Client):  # Supabase
-                try:
-                    result = db.table('users').select('*').eq('username', username).eq('password', password).execute()
-                    user = result.data[0] if result.data else None
-                    
-                    if user:
-                        return redirect('/dashboard')
-                    else:
-                        return """
-                        <html>
-                        <head><title>EA CRM - Login</title></head>
-                        <body>
-                            <h1>EA CRM Login</h1>
-                            <p style="color: red;">Invalid username or password</p>
-                            <form method="POST">
-                                <p>Username: <input type="text" name="username" required></p>
-                                <p>Password: <input type="password" name="password" required></p>
-                                <p><input type="submit" value="Login"></p>
-                            </form>
-                            <p><strong>Default:</strong> admin / admin123</p>
-                        </body>
-                        </html>
-                        """
-                except Exception as e:
-                    print(f"Supabase login error: {e}")
-                    return "Database error"
-            else:  # SQLite
-                cursor = db.cursor()
-                cursor.execute('SELECT * FROM users WHERE username = ? AND password = ?', (username, password))
-                user = cursor.fetchone()
-                db.close()
-                
-                if user:
-                    return redirect('/dashboard')
-                else:
-                    return """
-                    <html>
-                    <head><title>EA CRM - Login</title></head>
-                    <body>
-                        <h1>EA CRM Login</h1>
-                        <p style="color: red;">Invalid username or password</p>
-                        <form method="POST">
-                            <p>Username: <input type="text" name="username" required></p>
-                            <p>Password: <input type="password" name="password" required></p>
-                            <p><input type="submit" value="Login"></p>
-                        </form>
-                        <p><strong>Default:</strong> admin / admin123</p>
-                    </body>
-                    </html>
-                    """
-    
-    return """
-    <html>
-    <head><title>EA CRM - Login</title></head>
-    <body>
-        <h1>EA CRM Login</h1>
-        <form method="POST">
-            <p>Username: <input type="text" name="username" required></p>
-            <p>Password: <input type="password" name="password" required></p>
-            <p><input type="submit" value="Login"></p>
-        </form>
-        <p><strong>Default:</strong> admin / admin123</p>
-    </body>
-    </html>
-    """
+        backend = get_primary_backend()
+        if backend is None:
+            return "Database error"
+        try:
+            user = backend.authenticate(username, password)
+        except Exception as e:
+            print(f"{backend.label} login error: {e}")
+            return "Database error"
+        
+        if user:
+            return redirect_to('/dashboard')
+        else:
+            return Response(LOGIN_ERROR_PAGE, content_type=HTML_CONTENT_TYPE)
+    
+    return static_page(LOGIN_PAGE, LOGIN_PAGE_GZ, LOGIN_ETAG)
 
 @app.route('/dashboard')
 def dashboard():
-    db = get_db()
-    if not db:
+    backend = get_backend()
+    try:
+        stats = get_dashboard_stats(backend)
+    except Exception as e:
+        print(f"{backend.label} dashboard error: {e}")
         return "Database error"
+    # The page is a pure function of the backend and its counts
+    etag = hashlib.md5(f"{backend.label}-{stats}".encode('utf-8')).hexdigest()
+    cached = not_modified(etag)
+    if cached:
+        return cached
     
-    if isinstance(db, Client):  # Supabase
-        try:
-            # Get stats
-            leads_result = db.table('leads').select('*').execute()
-            total_leads = len(leads_result.data)
-            
-            new_leads_result = db.table('leads').select('*').eq('status', 'new').execute()
-            new_leads = len(new_leads_result.data)
-            
-            tasks_result = db.table('tasks').select('*').eq('status', 'pending').execute()
-            pending_tasks = len(tasks_result.data)
-            
-            completed_tasks_result = db.table('tasks').select('*').eq('status', 'completed').execute()
-            completed_tasks = len(completed_tasks_result.data)
-            
-        except Exception as e:
-            print(f"Supabase dashboard error: {e}")
-            total_leads = new_leads = pending_tasks = completed_tasks = 0
-    else:  # SQLite
-        cursor = db.cursor()
-        
-        # Get stats
-        cursor.execute('SELECT COUNT(*) FROM leads')
-        total_leads = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM leads WHERE status = "new"')
-        new_leads = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM tasks WHERE status = "pending"')
-        pending_tasks = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM tasks WHERE status = "completed"')
-        completed_tasks = cursor.fetchone()[0]
-        
-        db.close()
-    
-    return f"""
-    <html>
-    <head><title>EA CRM - Dashboard</title></head>
-    <body>
-        <h1>EA CRM Dashboard</h1>
-        <p>✅ Success! The CRM is working with {'Supabase' if isinstance(db, Client) else 'SQLite'} database!</p>
-        <p><a href="/leads">Leads</a> | <a href="/tasks">Tasks</a> | <a href="/add_lead">Add Lead</a> | <a href="/add_task">Add Task</a> | <a href="/">Logout</a></p>
-        
-        <h3>Stats:</h3>
-        <ul>
-            <li>Total Leads: {total_leads}</li>
-            <li>New Leads: {new_leads}</li>
-            <li>Pending Tasks: {pending_tasks}</li>
-            <li>Completed Tasks: {completed_tasks}</li>
-        </ul>
-        
-        <h3>Database Status:</h3>
-        <p>Currently using: {'Supabase (Production)' if isinstance(db, Client) else 'SQLite (Development)'}</p>
-        <ul>
-            <li>✅ View and manage leads</li>
-            <li>✅ Create and track tasks</li>
-            <li>✅ {'Permanent storage with Supabase' if isinstance(db, Client) else 'Temporary storage (in-memory)'}</li>
-            <li>🔄 Next: Add more features</li>
-        </ul>
-    </body>
-    </html>
-    """
+    total_leads, new_leads, pending_tasks, completed_tasks = stats
+    html = backend.dashboard_tpl.substitute(
+        total_leads=total_leads,
+        new_leads=new_leads,
+        pending_tasks=pending_tasks,
+        completed_tasks=completed_tasks
+    )
+    return revalidate(Response(html, content_type=HTML_CONTENT_TYPE), etag)
 
 @app.route('/leads')
 def leads():
-    db = get_db()
-    if not db:
+    backend = get_backend()
+    page, offset = get_page()
+    # Taken before the query, so a concurrent write can only make it stale
+    etag = listing_etag(backend, 'leads', page)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    try:
+        rows = backend.list_leads(offset, PAGE_SIZE)
+    except Exception as e:
+        print(f"{backend.label} leads error: {e}")
         return "Database error"
     
-    if isinstance(db, Client):  # Supabase
-        try:
-            result = db.table('leads').select('*').order('created_at', desc=True).execute()
-            leads = result.data
-        except Exception as e:
-            print(f"Supabase leads error: {e}")
-            leads = []
-    else:  # SQLite
-        cursor = db.cursor()
-        cursor.execute('SELECT * FROM leads ORDER BY created_at DESC')
-        leads = cursor.fetchall()
-        db.close()
-    
-    leads_html = ""
-    for lead in leads:
-        if isinstance(db, Client):  # Supabase data structure
-            leads_html += f"""
-            <tr>
-                <td>{lead.get('name', '')}</td>
-                <td>{lead.get('email', '')}</td>
-                <td>{lead.get('phone', '')}</td>
-                <td>{lead.get('company', '')}</td>
-                <td>{lead.get('status', '')}</td>
-                <td>{lead.get('source', '')}</td>
-            </tr>
-            """
-        else:  # SQLite data structure
-            leads_html += f"""
-            <tr>
-                <td>{lead[1]}</td>
-                <td>{lead[2]}</td>
-                <td>{lead[3]}</td>
-                <td>{lead[4]}</td>
-                <td>{lead[5]}</td>
-                <td>{lead[6]}</td>
-            </tr>
-            """
-    
-    return f"""
-    <html>
-    <head><title>EA CRM - Leads</title></head>
-    <body>
-        <h1>Leads Management</h1>
-        <p><a href="/dashboard">← Back to Dashboard</a> | <a href="/add_lead">Add New Lead</a></p>
-        
-        <table border="1" style="width: 100%; border-collapse: collapse;">
-            <tr>
-                <th>Name</th>
-                <th>Email</th>
-                <th>Phone</th>
-                <th>Company</th>
-                <th>Status</th>
-                <th>Source</th>
-            </tr>
-            {leads_html}
-        </table>
-        
-        <p><strong>Total Leads:</strong> {len(leads)}</p>
-        <p><strong>Database:</strong> {'Supabase' if isinstance(db, Client) else 'SQLite'}</p>
-    </body>
-    </html>
-    """
+    def generate():
+        count = 0
+        yield LEADS_HEADER
+        for row in rows:
+            count += 1
+            yield LEAD_ROW_TPL.substitute(dict(zip(LEAD_COLUMNS, map(escape, row)))).encode('utf-8')
+        yield backend.leads_footer_tpl.substitute(
+            page=page,
+            count=count,
+            pager=render_pager('/leads', page, count)
+        ).encode('utf-8')
+    
+    return revalidate(Response(generate(), content_type=HTML_CONTENT_TYPE), etag)
 
 @app.route('/add_lead', methods=['GET', 'POST'])
 def add_lead():
@@ -339,120 +800,47 @@ def add_lead():
         source = request.form.get('source', '')
         notes = request.form.get('notes', '')
         
-        db = get_db()
-        if db:
-            if isinstance(db, Client):  # Supabase
-                try:
-                    db.table('leads').insert({
-                        'name': name,
-                        'email': email,
-                        'phone': phone,
-                        'company': company,
-                        'source': source,
-                        'notes': notes
-                    }).execute()
-                    return redirect('/leads')
-                except Exception as e:
-                    print(f"Supabase add lead error: {e}")
-                    return "Database error"
-            else:  # SQLite
-                cursor = db.cursor()
-                cursor.execute('''
-                    INSERT INTO leads (name, email, phone, company, source, notes)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (name, email, phone, company, source, notes))
-                db.commit()
-                db.close()
-                return redirect('/leads')
-    
-    return """
-    <html>
-    <head><title>EA CRM - Add Lead</title></head>
-    <body>
-        <h1>Add New Lead</h1>
-        <p><a href="/leads">← Back to Leads</a></p>
-        
-        <form method="POST">
-            <p>Name: <input type="text" name="name" required></p>
-            <p>Email: <input type="email" name="email"></p>
-            <p>Phone: <input type="text" name="phone"></p>
-            <p>Company: <input type="text" name="company"></p>
-            <p>Source: <input type="text" name="source"></p>
-            <p>Notes: <textarea name="notes"></textarea></p>
-            <p><input type="submit" value="Add Lead"></p>
-        </form>
-    </body>
-    </html>
-    """
+        backend = get_primary_backend()
+        if backend is None:
+            return "Database error"
+        try:
+            backend.add_lead(name, email, phone, company, source, notes)
+        except Exception as e:
+            print(f"{backend.label} add lead error: {e}")
+            return "Database error"
+        mark_modified('leads')
+        return redirect_to('/leads')
+    
+    return static_page(ADD_LEAD_PAGE, ADD_LEAD_PAGE_GZ, ADD_LEAD_ETAG)
 
 @app.route('/tasks')
 def tasks():
-    db = get_db()
-    if not db:
+    backend = get_backend()
+    page, offset = get_page()
+    # Taken before the query, so a concurrent write can only make it stale
+    etag = listing_etag(backend, 'tasks', page)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    try:
+        rows = backend.list_tasks(offset, PAGE_SIZE)
+    except Exception as e:
+        print(f"{backend.label} tasks error: {e}")
         return "Database error"
     
-    if isinstance(db, Client):  # Supabase
-        try:
-            result = db.table('tasks').select('*').order('created_at', desc=True).execute()
-            tasks = result.data
-        except Exception as e:
-            print(f"Supabase tasks error: {e}")
-            tasks = []
-    else:  # SQLite
-        cursor = db.cursor()
-        cursor.execute('SELECT * FROM tasks ORDER BY created_at DESC')
-        tasks = cursor.fetchall()
-        db.close()
-    
-    tasks_html = ""
-    for task in tasks:
-        if isinstance(db, Client):  # Supabase data structure
-            tasks_html += f"""
-            <tr>
-                <td>{task.get('title', '')}</td>
-                <td>{task.get('description', '')}</td>
-                <td>{task.get('status', '')}</td>
-                <td>{task.get('priority', '')}</td>
-                <td>{task.get('due_date', '')}</td>
-                <td>{task.get('assigned_to', '')}</td>
-            </tr>
-            """
-        else:  # SQLite data structure
-            tasks_html += f"""
-            <tr>
-                <td>{task[1]}</td>
-                <td>{task[2]}</td>
-                <td>{task[3]}</td>
-                <td>{task[4]}</td>
-                <td>{task[5]}</td>
-                <td>{task[6]}</td>
-            </tr>
-            """
-    
-    return f"""
-    <html>
-    <head><title>EA CRM - Tasks</title></head>
-    <body>
-        <h1>Tasks Management</h1>
-        <p><a href="/dashboard">← Back to Dashboard</a> | <a href="/add_task">Add New Task</a></p>
-        
-        <table border="1" style="width: 100%; border-collapse: collapse;">
-            <tr>
-                <th>Title</th>
-                <th>Description</th>
-                <th>Status</th>
-                <th>Priority</th>
-                <th>Due Date</th>
-                <th>Assigned To</th>
-            </tr>
-            {tasks_html}
-        </table>
-        
-        <p><strong>Total Tasks:</strong> {len(tasks)}</p>
-        <p><strong>Database:</strong> {'Supabase' if isinstance(db, Client) else 'SQLite'}</p>
-    </body>
-    </html>
-    """
+    def generate():
+        count = 0
+        yield TASKS_HEADER
+        for row in rows:
+            count += 1
+            yield TASK_ROW_TPL.substitute(dict(zip(TASK_COLUMNS, map(escape, row)))).encode('utf-8')
+        yield backend.tasks_footer_tpl.substitute(
+            page=page,
+            count=count,
+            pager=render_pager('/tasks', page, count)
+        ).encode('utf-8')
+    
+    return revalidate(Response(generate(), content_type=HTML_CONTENT_TYPE), etag)
 
 @app.route('/add_task', methods=['GET', 'POST'])
 def add_task():
@@ -463,59 +851,43 @@ def add_task():
         due_date = request.form.get('due_date', '')
         assigned_to = request.form.get('assigned_to', 'admin')
         
-        db = get_db()
-        if db:
-            if isinstance(db, Client):  # Supabase
-                try:
-                    db.table('tasks').insert({
-                        'title': title,
-                        'description': description,
-                        'priority': priority,
-                        'due_date': due_date,
-                        'assigned_to': assigned_to
-                    }).execute()
-                    return redirect('/tasks')
-                except Exception as e:
-                    print(f"Supabase add task error: {e}")
-                    return "Database error"
-            else:  # SQLite
-                cursor = db.cursor()
-                cursor.execute('''
-                    INSERT INTO tasks (title, description, priority, due_date, assigned_to)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (title, description, priority, due_date, assigned_to))
-                db.commit()
-                db.close()
-                return redirect('/tasks')
-    
-    return """
-    <html>
-    <head><title>EA CRM - Add Task</title></head>
-    <body>
-        <h1>Add New Task</h1>
-        <p><a href="/tasks">← Back to Tasks</a></p>
-        
-        <form method="POST">
-            <p>Title: <input type="text" name="title" required></p>
-            <p>Description: <textarea name="description"></textarea></p>
-            <p>Priority: 
-                <select name="priority">
-                    <option value="low">Low</option>
-                    <option value="medium" selected>Medium</option>
-                    <option value="high">High</option>
-                </select>
-            </p>
-            <p>Due Date: <input type="date" name="due_date"></p>
-            <p>Assigned To: <input type="text" name="assigned_to" value="admin"></p>
-            <p><input type="submit" value="Add Task"></p>
-        </form>
-    </body>
-    </html>
-    """
+        backend = get_primary_backend()
+        if backend is None:
+            return "Database error"
+        try:
+            backend.add_task(title, description, priority, due_date, assigned_to)
+        except Exception as e:
+            print(f"{backend.label} add task error: {e}")
+            return "Database error"
+        mark_modified('tasks')
+        return redirect_to('/tasks')
+    
+    return static_page(ADD_TASK_PAGE, ADD_TASK_PAGE_GZ, ADD_TASK_ETAG)
 
 @app.route('/health')
 def health():
-    return "Health check: OK ✅"
+    # Probe results must never be served from a cache
+    return Response(HEALTH_PAGE, content_type=HTML_CONTENT_TYPE, headers={'Cache-Control': 'no-store'})
+
+def health_shortcut(wsgi_app):
+    """Answer GET /health straight from WSGI, before Flask routing runs"""
+    headers = [
+        ('Content-Type', HTML_CONTENT_TYPE),
+        ('Content-Length', str(len(HEALTH_PAGE))),
+        ('Cache-Control', 'no-store'),
+    ]
+    body = [HEALTH_PAGE]
+    
+    def application(environ, start_response):
+        if environ.get('PATH_INFO') == '/health' and environ.get('REQUEST_METHOD') == 'GET':
+            start_response('200 OK', list(headers))
+            return body
+        return wsgi_app(environ, start_response)
+    
+    return application
+
+# Load balancers probe /health constantly; skip the request context for them
+app.wsgi_app = health_shortcut(app.wsgi_app)
 
 if __name__ == "__main__":
-    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)), debug=False) 
\ No newline at end of file
+    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)), debug=False)
\ No newline at end of file
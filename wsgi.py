@@ -10,83 +10,131 @@ import sys
 # Add the current directory to Python path
 sys.path.insert(0, os.path.dirname(__file__))
 
-# Set default environment variables for Vercel
-os.environ.setdefault('FLASK_ENV', 'production')
-os.environ.setdefault('SECRET_KEY', 'your-secret-key-here-12345')
-os.environ.setdefault('DATABASE_URL', 'sqlite:///instance/leads.db')
-os.environ.setdefault('OPENROUTER_API_KEY', '')
+# EA_WSGI_MODE picks the deployment flavour once, at import:
+#   vercel     - fill in placeholder settings and serve a setup page if the
+#                app can't start (default)
+#   production - use the environment as-is and fail loudly (Apache/gunicorn)
+WSGI_MODE = os.environ.get('EA_WSGI_MODE', 'vercel')
 
-try:
-    # Import the Flask application
+# Default environment variables for Vercel
+VERCEL_ENV_DEFAULTS = (
+    ('FLASK_ENV', 'production'),
+    ('SECRET_KEY', 'your-secret-key-here-12345'),
+    ('DATABASE_URL', 'sqlite:///instance/leads.db'),
+    ('OPENROUTER_API_KEY', ''),
+)
+
+if WSGI_MODE == 'vercel':
+    for name, value in VERCEL_ENV_DEFAULTS:
+        os.environ.setdefault(name, value)
+
+def make_app():
+    """Create the full EA CRM application"""
     from app import create_app
+    return create_app()
+
+def create_fallback_app(exc):
+    """Create an app that explains the startup error instead of crashing
+
+    Everything it needs is imported and built in here, so a healthy start
+    never pays for it and deploy bundles that ship wsgi.py always have it.
+    """
+    import json
+    from flask import Flask, Response
     
-    # Create the application instance
-    app = create_app()
-    
-    # For Vercel deployment
-    if __name__ == "__main__":
-        app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)), debug=False)
+    error_html = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>EA CRM - Setup Required</title>
+        <style>
+            body { font-family: Arial, sans-serif; margin: 40px; background: #f5f5f5; }
+            .container { max-width: 600px; margin: 0 auto; background: white; padding: 30px; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+            .error { color: #d32f2f; background: #ffebee; padding: 15px; border-radius: 4px; margin: 20px 0; }
+            .success { color: #388e3c; background: #e8f5e8; padding: 15px; border-radius: 4px; margin: 20px 0; }
+            .code { background: #f5f5f5; padding: 10px; border-radius: 4px; font-family: monospace; margin: 10px 0; }
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <h1>🚀 EA CRM - Deployment Status</h1>
+        
+            <div class="success">
+                <strong>✅ Deployment Successful!</strong><br>
+                Your EA CRM application has been deployed to Vercel successfully.
+            </div>
+        
+            <div class="error">
+                <strong>⚠️ Setup Required</strong><br>
+                The application needs environment variables to be configured.
+            </div>
+        
+            <h2>🔧 Next Steps:</h2>
+            <ol>
+                <li><strong>Add Environment Variables</strong> in Vercel Dashboard:
+                    <div class="code">
+                        SECRET_KEY=your-secret-key-here<br>
+                        OPENROUTER_API_KEY=your-api-key<br>
+                        FLASK_ENV=production
+                    </div>
+                </li>
+                <li><strong>Database Setup</strong> - The app will create SQLite database automatically</li>
+                <li><strong>Test Login</strong> - Use admin/admin123 after setup</li>
+            </ol>
         
-except Exception as e:
-    # Create a simple error handler for debugging
-    from flask import Flask, render_template_string
+            <h2>🐛 Debug Information:</h2>
+            <div class="code">
+                Error: {{ error }}
+            </div>
+        
+            <p><em>This is a temporary page while the application is being configured.</em></p>
+        </div>
+    </body>
+    </html>
+    """
     
     app = Flask(__name__)
     
+    # The error can't change after startup, so the page is rendered once
+    error_page = app.jinja_env.from_string(error_html).render(error=str(exc)).encode('utf-8')
+    
+    # Health probes always get the same payload, so it is serialized once
+    health_body = json.dumps(
+        {"status": "ok", "message": "EA CRM is deployed but needs configuration"},
+        separators=(',', ':')
+    ).encode('utf-8')
+    
     @app.route('/')
     def error():
-        error_html = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>EA CRM - Setup Required</title>
-            <style>
-                body { font-family: Arial, sans-serif; margin: 40px; background: #f5f5f5; }
-                .container { max-width: 600px; margin: 0 auto; background: white; padding: 30px; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
-                .error { color: #d32f2f; background: #ffebee; padding: 15px; border-radius: 4px; margin: 20px 0; }
-                .success { color: #388e3c; background: #e8f5e8; padding: 15px; border-radius: 4px; margin: 20px 0; }
-                .code { background: #f5f5f5; padding: 10px; border-radius: 4px; font-family: monospace; margin: 10px 0; }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>🚀 EA CRM - Deployment Status</h1>
-                
-                <div class="success">
-                    <strong>✅ Deployment Successful!</strong><br>
-                    Your EA CRM application has been deployed to Vercel successfully.
-                </div>
-                
-                <div class="error">
-                    <strong>⚠️ Setup Required</strong><br>
-                    The application needs environment variables to be configured.
-                </div>
-                
-                <h2>🔧 Next Steps:</h2>
-                <ol>
-                    <li><strong>Add Environment Variables</strong> in Vercel Dashboard:
-                        <div class="code">
-                            SECRET_KEY=your-secret-key-here<br>
-                            OPENROUTER_API_KEY=your-api-key<br>
-                            FLASK_ENV=production
-                        </div>
-                    </li>
-                    <li><strong>Database Setup</strong> - The app will create SQLite database automatically</li>
-                    <li><strong>Test Login</strong> - Use admin/admin123 after setup</li>
-                </ol>
-                
-                <h2>🐛 Debug Information:</h2>
-                <div class="code">
-                    Error: {{ error }}
-                </div>
-                
-                <p><em>This is a temporary page while the application is being configured.</em></p>
-            </div>
-        </body>
-        </html>
-        """
-        return render_template_string(error_html, error=str(e))
+        return Response(error_page, content_type='text/html; charset=utf-8')
     
     @app.route('/health')
     def health():
-        return {"status": "ok", "message": "EA CRM is deployed but needs configuration"} 
\ No newline at end of file
+        return Response(health_body, mimetype='application/json', headers={'Cache-Control': 'no-store'})
+    
+    return app
+
+if WSGI_MODE == 'production':
+    app = make_app()
+else:
+    try:
+        app = make_app()
+    except Exception as e:
+        # Serve a setup page rather than failing every request, but keep the
+        # real traceback in the logs so the failure isn't masked
+        import traceback
+        traceback.print_exc()
+        app = create_fallback_app(e)
+
+# mod_wsgi and the gunicorn docs look for "application"
+application = app
+
+# For running without a front-end server; EA_SERVER=waitress swaps Werkzeug's
+# development server for waitress (pip install waitress)
+if __name__ == "__main__":
+    port = int(os.environ.get('PORT', 5000))
+    if os.environ.get('EA_SERVER', 'werkzeug') == 'waitress':
+        from waitress import serve
+        serve(app, host='0.0.0.0', port=port)
+    else:
+        app.run(host='0.0.0.0', port=port, debug=False)